@@ -0,0 +1,178 @@
+"""
+分散スキャンエージェント
+
+中央APIからスキャンジョブをHTTPでリースし、NetworkScanner / PortScanner で
+ローカルに実行して、結果をgzip圧縮したバッチで送り返す。
+実行中のジョブはハートビートでリースを延長し、エージェントが停止した場合は
+リース期限切れにより中央APIが他のエージェントへ再割り当てする。
+
+使い方:
+    python -m backend.agent --server http://192.168.1.5:8000 [--agent-id vlan20-a] [--concurrency 2]
+
+同一ホストで複数起動する場合も、エージェントIDは「ホスト名-PID」で自動的に区別される。
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+
+import aiohttp
+
+import sys
+sys.path.append('..')
+from backend.network_scanner import NetworkScanner
+from backend.port_scanner import PortScanner
+from config.config import AGENT_CONFIG
+
+
+class ScanAgent:
+    def __init__(self, server_url: str, agent_id: str, max_concurrency: int):
+        self.server_url = server_url.rstrip('/')
+        self.agent_id = agent_id
+        self.max_concurrency = max_concurrency
+        self.hostname = socket.gethostname()
+        self.network_scanner = NetworkScanner()
+        self.port_scanner = PortScanner()
+        # スキャンはブロッキング処理のため同時実行数分のスレッドで実行
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="agent-scan",
+        )
+        self.running: Dict[int, asyncio.Task] = {}
+        # 実行済みで結果が未送信のジョブ（送信完了までリースを延長する）
+        self.unsent_job_ids: Set[int] = set()
+        self.results: asyncio.Queue = asyncio.Queue()
+
+    def _url(self, action: str) -> str:
+        return f"{self.server_url}/api/agents/{self.agent_id}/{action}"
+
+    def _heartbeat_payload(self) -> Dict:
+        return {
+            "hostname": self.hostname,
+            "max_concurrency": self.max_concurrency,
+            "running_job_ids": list(self.running.keys()) + list(self.unsent_job_ids),
+        }
+
+    async def run(self):
+        """
+        ジョブ取得・ハートビート・結果送信のループを開始
+        """
+        print(f"エージェント起動: {self.agent_id} (サーバー: {self.server_url}, 同時実行数: {self.max_concurrency})")
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            await asyncio.gather(
+                self._lease_loop(session),
+                self._heartbeat_loop(session),
+                self._upload_loop(session),
+            )
+
+    async def _lease_loop(self, session: aiohttp.ClientSession):
+        while True:
+            free_slots = self.max_concurrency - len(self.running)
+            if free_slots > 0:
+                try:
+                    payload = self._heartbeat_payload()
+                    payload["max_jobs"] = free_slots
+                    async with session.post(self._url("lease"), json=payload) as response:
+                        response.raise_for_status()
+                        lease = await response.json()
+                    for job in lease["jobs"]:
+                        print(f"ジョブ取得: #{job['id']} {job['job_type']} {job['target']}")
+                        self.running[job["id"]] = asyncio.create_task(self._run_job(job))
+                except Exception as e:
+                    print(f"ジョブ取得エラー: {e}")
+            await asyncio.sleep(AGENT_CONFIG["poll_interval"])
+
+    async def _heartbeat_loop(self, session: aiohttp.ClientSession):
+        while True:
+            await asyncio.sleep(AGENT_CONFIG["heartbeat_interval"])
+            try:
+                async with session.post(self._url("heartbeat"), json=self._heartbeat_payload()) as response:
+                    response.raise_for_status()
+            except Exception as e:
+                print(f"ハートビート送信エラー: {e}")
+
+    async def _run_job(self, job: Dict):
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, self._execute, job)
+            result.update({"job_id": job["id"], "success": True})
+        except Exception as e:
+            print(f"ジョブ実行エラー #{job['id']}: {e}")
+            result = {"job_id": job["id"], "success": False, "error": str(e)}
+        self.unsent_job_ids.add(job["id"])
+        self.running.pop(job["id"], None)
+        await self.results.put(result)
+
+    def _execute(self, job: Dict) -> Dict:
+        """
+        ジョブをローカルで実行（スレッドプール内で呼ばれる）
+        """
+        if job["job_type"] == "network":
+            return {"devices": self.network_scanner.scan_network(job["target"])}
+        if job["job_type"] == "ports":
+            self.port_scanner.warm_up()
+            return self.port_scanner.scan_ports(job["target"])
+        raise ValueError(f"未対応のジョブ種別: {job['job_type']}")
+
+    async def _upload_loop(self, session: aiohttp.ClientSession):
+        pending: List[Dict] = []
+        while True:
+            # 最初の1件を待ち、以降は flush 間隔内に届いた結果をまとめる
+            if not pending:
+                pending.append(await self.results.get())
+            deadline = time.monotonic() + AGENT_CONFIG["result_flush_interval"]
+            while len(pending) < AGENT_CONFIG["result_batch_size"]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.results.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            body = gzip.compress(json.dumps({"results": pending}).encode("utf-8"))
+            try:
+                async with session.post(
+                    self._url("results"),
+                    data=body,
+                    headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+                ) as response:
+                    if 400 <= response.status < 500:
+                        # 不正なバッチは再送しても受理されないため破棄し、リース延長も止める
+                        print(f"結果送信が拒否されました (HTTP {response.status}): {await response.text()}")
+                        self.unsent_job_ids.difference_update(result["job_id"] for result in pending)
+                        pending = []
+                        continue
+                    response.raise_for_status()
+                    summary = await response.json()
+                print(f"結果送信: 受理 {len(summary['accepted'])}件, 破棄 {len(summary['rejected'])}件")
+                self.unsent_job_ids.difference_update(result["job_id"] for result in pending)
+                pending = []
+            except Exception as e:
+                # 送信に失敗した結果は保持して次回再送
+                print(f"結果送信エラー: {e}")
+                await asyncio.sleep(AGENT_CONFIG["poll_interval"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分散スキャンエージェント")
+    parser.add_argument("--server", required=True, help="中央APIのURL（例: http://192.168.1.5:8000）")
+    parser.add_argument("--agent-id", default=f"{socket.gethostname()}-{os.getpid()}", help="エージェントID")
+    parser.add_argument("--concurrency", type=int, default=AGENT_CONFIG["max_concurrency"], help="同時実行ジョブ数")
+    args = parser.parse_args()
+
+    agent = ScanAgent(args.server, args.agent_id, args.concurrency)
+    try:
+        asyncio.run(agent.run())
+    except KeyboardInterrupt:
+        print("エージェント停止")
+
+
+if __name__ == "__main__":
+    main()
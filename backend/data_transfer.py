@@ -0,0 +1,250 @@
+"""
+データのエクスポート/インポートモジュール
+
+デバイス・ポートスキャン履歴・HTTPレスポンスをNDJSON/CSVでストリーミング出力し、
+同じ形式のデータをバッチINSERTで取り込む。
+"""
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import DateTime, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+sys.path.append('..')
+from backend import models, schemas
+from backend.database import AsyncSessionLocal
+from config.config import EXPORT_CONFIG
+
+# エクスポート/インポート対象のテーブル
+EXPORT_MODELS = {
+    "devices": models.Device,
+    "port_scans": models.PortScan,
+    "http_responses": models.HttpResponse,
+}
+
+# インポート時に各行を検証するスキーマ
+IMPORT_SCHEMAS = {
+    "devices": schemas.DeviceCreate,
+    "port_scans": schemas.PortScanBase,
+    "http_responses": schemas.HttpResponseBase,
+}
+
+# 出力形式ごとのContent-Type
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _columns(table: str):
+    return EXPORT_MODELS[table].__table__.columns
+
+
+def _to_record(row) -> Dict:
+    """
+    DBの行をエクスポート用の辞書に変換
+    """
+    record = {}
+    for key, value in row.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        record[key] = value
+    return record
+
+
+async def iter_records(table: str, device_ip: Optional[str] = None) -> AsyncIterator[Dict]:
+    """
+    サーバーサイドカーソルでテーブルを走査し、1行ずつ辞書として返す
+
+    全件をメモリに載せず fetch_batch_size 行ずつフェッチするため、
+    行数に関わらずメモリ使用量は一定になる。
+    """
+    model = EXPORT_MODELS[table]
+    stmt = select(*_columns(table)).order_by(model.id)
+    if device_ip:
+        ip_column = model.ip_address if table == "devices" else model.device_ip
+        stmt = stmt.where(ip_column == device_ip)
+
+    # レスポンスのストリーミング中も使えるよう専用のセッションを開く
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            stmt.execution_options(yield_per=EXPORT_CONFIG["fetch_batch_size"])
+        )
+        async for row in result.mappings():
+            yield _to_record(row)
+
+
+async def stream_ndjson(table: str, device_ip: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    NDJSON形式でエクスポート（chunk_rows 行ごとに1チャンク）
+    """
+    chunk = []
+    async for record in iter_records(table, device_ip):
+        if table == "http_responses" and record.get("headers"):
+            # ヘッダーはJSON文字列で保存されているためオブジェクトとして出力
+            try:
+                record["headers"] = json.loads(record["headers"])
+            except ValueError:
+                pass
+        chunk.append(json.dumps(record, ensure_ascii=False))
+        if len(chunk) >= EXPORT_CONFIG["chunk_rows"]:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+async def stream_csv(table: str, device_ip: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    CSV形式でエクスポート（先頭行はヘッダー）
+    """
+    fieldnames = [column.name for column in _columns(table)]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+
+    rows = 0
+    async for record in iter_records(table, device_ip):
+        writer.writerow(record)
+        rows += 1
+        if rows >= EXPORT_CONFIG["chunk_rows"]:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows = 0
+    yield buffer.getvalue()
+
+
+def stream_export(table: str, format: str, device_ip: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    指定形式のエクスポートジェネレーターを返す
+    """
+    if format == "csv":
+        return stream_csv(table, device_ip)
+    return stream_ndjson(table, device_ip)
+
+
+def _parse_records(stream: TextIO, format: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    NDJSON/CSVを1行ずつ（行番号, 辞書）として読み出す
+    """
+    if format == "csv":
+        for line_number, row in enumerate(csv.DictReader(stream), start=2):
+            # CSVの空欄はNULLとして扱う
+            yield line_number, {key: (value if value != "" else None) for key, value in row.items()}
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{line_number}行目: JSONの解析に失敗しました ({e})")
+        if not isinstance(record, dict):
+            raise ValueError(f"{line_number}行目: JSONオブジェクトではありません")
+        yield line_number, record
+
+
+def _to_datetime(value):
+    """
+    ISO形式の文字列を日時に変換
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _normalize(table: str, record: Dict) -> Dict:
+    """
+    インポート用に全カラムを揃えた辞書を作成（idは採番し直す）
+
+    各行は対応するスキーマで検証し、status="unknown" や is_open=False などの
+    既定値を適用する。executemany は全行で同じキーを要求するため、欠けている日時は
+    現在時刻で補完する。
+    """
+    # 空欄（None）は未指定として扱い、スキーマの既定値を使う
+    values = {key: value for key, value in record.items() if value is not None}
+    if table == "http_responses" and isinstance(values.get("headers"), str):
+        # CSVではヘッダーがJSON文字列のまま入っている
+        values["headers"] = json.loads(values["headers"])
+    validated = IMPORT_SCHEMAS[table](**values).dict()
+
+    normalized = {}
+    for column in _columns(table):
+        if column.primary_key:
+            continue
+        if column.name in validated:
+            value = validated[column.name]
+        else:
+            value = _to_datetime(values.get(column.name))
+        if value is None and isinstance(column.type, DateTime):
+            value = datetime.utcnow()
+        if column.name == "headers" and value is not None:
+            value = json.dumps(value)
+        normalized[column.name] = value
+    return normalized
+
+
+async def _insert_batch(db: AsyncSession, table: str, batch: List[Dict]):
+    model = EXPORT_MODELS[table]
+    if table == "devices":
+        # 既存デバイスはIPアドレスをキーに上書き
+        stmt = sqlite_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.ip_address],
+            set_={
+                name: stmt.excluded[name]
+                for name in batch[0].keys()
+                if name not in ("ip_address", "first_detected")
+            },
+        )
+    else:
+        stmt = insert(model)
+    await db.execute(stmt, batch)
+
+
+def _iter_normalized(table: str, stream: TextIO, format: str) -> Iterator[Dict]:
+    for line_number, record in _parse_records(stream, format):
+        try:
+            yield _normalize(table, record)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{line_number}行目: {e}")
+
+
+def _take_batch(records: Iterator[Dict], batch_size: int) -> List[Dict]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            break
+    return batch
+
+
+async def import_records(db: AsyncSession, table: str, stream: TextIO, format: str) -> int:
+    """
+    NDJSON/CSVのデータを import_batch_size 行ずつ一括INSERTする
+
+    アップロードファイルの読み込みと解析はブロッキング処理のためスレッドで行う。
+    全体を1トランザクションで処理し、不正な行があれば呼び出し元でロールバックする。
+    """
+    batch_size = EXPORT_CONFIG["import_batch_size"]
+    records = _iter_normalized(table, stream, format)
+    imported_count = 0
+
+    while True:
+        batch = await asyncio.to_thread(_take_batch, records, batch_size)
+        if not batch:
+            break
+        await _insert_batch(db, table, batch)
+        imported_count += len(batch)
+
+    await db.commit()
+    return imported_count
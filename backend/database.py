@@ -1,28 +1,47 @@
 """
 データベース接続設定
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import sys
 sys.path.append('..')
-from config.config import DATABASE_URL
+from config.config import ASYNC_DATABASE_URL, DATABASE_POOL_CONFIG
 from backend.models import Base
 
-# エンジンの作成
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# 非同期エンジンの作成（aiosqlite）
+# 既定のNullPoolではリクエストごとに接続とスレッドを作るため、上限付きのプールで再利用する
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DATABASE_POOL_CONFIG["pool_size"],
+    max_overflow=DATABASE_POOL_CONFIG["max_overflow"],
+    pool_timeout=DATABASE_POOL_CONFIG["pool_timeout"],
+)
+
+# WALモードを有効化
+# ロールバックジャーナルでは読み込み中のカーソル（ストリーミングのエクスポートなど）が
+# 書き込みをブロックするため、読み込みと書き込みを並行できるようにする
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
 
 # セッションの作成
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # セッション取得関数
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # テーブル作成
-def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
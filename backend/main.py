@@ -1,21 +1,31 @@
 """
 FastAPIアプリケーション
 """
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import Dict, List, Optional
+import io
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+import gzip
+import asyncio
+import ipaddress
+import nmap
 
 import sys
 sys.path.append('..')
 
-from backend.database import get_db, init_db
-from backend import models, schemas
-from backend.network_scanner import NetworkScanner
-from backend.port_scanner import PortScanner
-from config.config import API_CONFIG
+from backend.database import get_db, init_db, engine, AsyncSessionLocal
+from backend import models, schemas, data_transfer, scanners
+from backend.scanners import get_scanner_status, warm_up_scanners_in_background
+from backend.response_cache import response_cache
+from backend.rate_controller import get_rate_metrics
+from backend.neighbor_listener import NeighborListener
+from config.config import API_CONFIG, STARTUP_CONFIG, AGENT_CONFIG, PASSIVE_DISCOVERY_CONFIG
 
 # FastAPIインスタンスの作成
 app = FastAPI(title="LAN監視 API")
@@ -29,45 +39,138 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# パッシブ検出と定期スキャンのバックグラウンド処理
+neighbor_listener: Optional[NeighborListener] = None
+background_tasks: List[asyncio.Task] = []
+
 # 起動時の処理
 @app.on_event("startup")
-def startup_event():
-    init_db()
+async def startup_event():
+    global neighbor_listener
+    await init_db()
+    # スキャナーは起動をブロックせずバックグラウンドで初期化
+    if STARTUP_CONFIG["warmup_scanners"]:
+        warm_up_scanners_in_background()
+    
+    if PASSIVE_DISCOVERY_CONFIG["enabled"] and sys.platform.startswith("linux"):
+        try:
+            neighbor_listener = NeighborListener()
+            neighbor_listener.start()
+        except OSError as e:
+            print(f"パッシブ検出を開始できませんでした: {e}")
+            neighbor_listener = None
+    # 取りこぼし確認のスキャンはパッシブ検出が動作している場合のみ行う
+    if neighbor_listener is not None and PASSIVE_DISCOVERY_CONFIG["safety_sweep_interval"] > 0:
+        background_tasks.append(asyncio.create_task(_periodic_safety_sweep()))
+
+# 終了時の処理
+@app.on_event("shutdown")
+async def shutdown_event():
+    if neighbor_listener is not None:
+        neighbor_listener.stop()
+    for task in background_tasks:
+        task.cancel()
+    # aiosqliteの接続スレッドは非デーモンのため、プールの接続を閉じないとプロセスが終了しない
+    await engine.dispose()
 
-# スキャナーインスタンス
-network_scanner = NetworkScanner()
-port_scanner = PortScanner()
+async def _periodic_safety_sweep():
+    """
+    パッシブ検出の取りこぼしを補うため、デフォルト範囲を定期的にアクティブスキャン
+    """
+    while True:
+        await asyncio.sleep(PASSIVE_DISCOVERY_CONFIG["safety_sweep_interval"])
+        try:
+            devices = await scanners.scan_network()
+            async with AsyncSessionLocal() as db:
+                await _save_network_devices(db, devices)
+                await db.commit()
+            response_cache.invalidate()
+        except Exception as e:
+            print(f"定期スキャンエラー: {e}")
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "LAN監視 API"}
 
+@app.get("/api/scanners/status")
+async def scanner_status():
+    """
+    スキャナー（nmap）の初期化状態を取得
+    """
+    return get_scanner_status()
+
+@app.get("/api/metrics/rate-control")
+async def rate_control_metrics():
+    """
+    スキャナーの輻輳制御の状態（現在のウィンドウ・損失率など）を取得
+    """
+    return get_rate_metrics()
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    レスポンスキャッシュの統計情報を取得
+    """
+    return response_cache.stats()
+
+_device_list_adapter = TypeAdapter(List[schemas.Device])
+
+def _json_response(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
 @app.get("/api/devices", response_model=List[schemas.Device])
-def get_devices(db: Session = Depends(get_db)):
+async def get_devices(db: AsyncSession = Depends(get_db)):
     """
     全デバイスの一覧を取得
     """
-    devices = db.query(models.Device).all()
-    return devices
+    cached = response_cache.get("devices")
+    if cached is not None:
+        return _json_response(cached)
+    
+    # 読み込み中に書き込みがあった場合に古い結果を登録しないよう先にバージョンを取得
+    cache_version = response_cache.version
+    result = await db.execute(select(models.Device))
+    devices = _device_list_adapter.validate_python(result.scalars().all(), from_attributes=True)
+    content = _device_list_adapter.dump_json(devices)
+    response_cache.set("devices", content, cache_version)
+    
+    return _json_response(content)
 
 @app.get("/api/devices/{ip_address}", response_model=schemas.DeviceDetail)
-def get_device_detail(ip_address: str, db: Session = Depends(get_db)):
+async def get_device_detail(ip_address: str, db: AsyncSession = Depends(get_db)):
     """
     特定デバイスの詳細情報を取得
     """
-    device = db.query(models.Device).filter(models.Device.ip_address == ip_address).first()
+    cache_key = f"device:{ip_address}"
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+    
+    cache_version = response_cache.version
+    result = await db.execute(
+        select(models.Device).where(models.Device.ip_address == ip_address)
+    )
+    device = result.scalars().first()
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
     
     # ポートスキャン結果を取得
-    port_scans = db.query(models.PortScan).filter(
-        models.PortScan.device_ip == ip_address
-    ).order_by(models.PortScan.scan_time.desc()).limit(10).all()
+    result = await db.execute(
+        select(models.PortScan)
+        .where(models.PortScan.device_ip == ip_address)
+        .order_by(models.PortScan.scan_time.desc())
+        .limit(10)
+    )
+    port_scans = result.scalars().all()
     
     # HTTPレスポンス情報を取得
-    http_responses = db.query(models.HttpResponse).filter(
-        models.HttpResponse.device_ip == ip_address
-    ).order_by(models.HttpResponse.scan_time.desc()).limit(5).all()
+    result = await db.execute(
+        select(models.HttpResponse)
+        .where(models.HttpResponse.device_ip == ip_address)
+        .order_by(models.HttpResponse.scan_time.desc())
+        .limit(5)
+    )
+    http_responses = result.scalars().all()
     
     # ヘッダー情報をJSONからdictに変換
     for response in http_responses:
@@ -79,22 +182,21 @@ def get_device_detail(ip_address: str, db: Session = Depends(get_db)):
         port_scans=port_scans,
         http_responses=http_responses
     )
+    content = device_detail.model_dump_json().encode("utf-8")
+    response_cache.set(cache_key, content, cache_version)
     
-    return device_detail
+    return _json_response(content)
 
-@app.post("/api/scan/network")
-def scan_network(scan_request: schemas.ScanRequest, db: Session = Depends(get_db)):
+async def _save_network_devices(db: AsyncSession, devices: List[Dict]):
     """
-    ネットワークスキャンを実行
+    ネットワークスキャン結果をデバイス一覧に反映（コミットは呼び出し元で行う）
     """
-    devices = network_scanner.scan_network(scan_request.network_range)
-    
-    # スキャン結果を保存
     for device_data in devices:
         # 既存のデバイスかチェック
-        existing_device = db.query(models.Device).filter(
-            models.Device.ip_address == device_data['ip_address']
-        ).first()
+        result = await db.execute(
+            select(models.Device).where(models.Device.ip_address == device_data['ip_address'])
+        )
+        existing_device = result.scalars().first()
         
         if existing_device:
             # 更新
@@ -106,8 +208,55 @@ def scan_network(scan_request: schemas.ScanRequest, db: Session = Depends(get_db
             # 新規作成
             new_device = models.Device(**device_data)
             db.add(new_device)
+
+def _add_port_scan_results(
+    db: AsyncSession,
+    ip_address: str,
+    port_scans: List[Dict],
+    http_responses: List[Dict]
+):
+    """
+    ポートスキャン結果とHTTPレスポンス情報をセッションに追加（コミットは呼び出し元で行う）
+    """
+    # ポートスキャン結果を保存
+    for port_info in port_scans:
+        port_scan = models.PortScan(
+            device_ip=ip_address,
+            port=port_info['port'],
+            service=port_info.get('service'),
+            service_name=port_info.get('service_name'),
+            is_open=port_info.get('is_open', False)
+        )
+        db.add(port_scan)
     
-    db.commit()
+    # HTTPレスポンス情報を保存
+    for http_info in http_responses:
+        # ヘッダーをJSON文字列に変換
+        headers_json = json.dumps(http_info['headers']) if http_info.get('headers') else None
+        
+        http_response = models.HttpResponse(
+            device_ip=ip_address,
+            url=http_info['url'],
+            status_code=http_info.get('status_code'),
+            headers=headers_json,
+            body_preview=http_info.get('body_preview')
+        )
+        db.add(http_response)
+
+@app.post("/api/scan/network")
+async def scan_network(scan_request: schemas.ScanRequest, db: AsyncSession = Depends(get_db)):
+    """
+    ネットワークスキャンを実行
+    """
+    try:
+        devices = await scanners.scan_network(scan_request.network_range)
+    except nmap.PortScannerError as e:
+        raise HTTPException(status_code=503, detail=f"Network scanner is unavailable: {str(e)}")
+    
+    # スキャン結果を保存
+    await _save_network_devices(db, devices)
+    await db.commit()
+    response_cache.invalidate()
     
     return {
         "message": "Network scan completed",
@@ -115,26 +264,27 @@ def scan_network(scan_request: schemas.ScanRequest, db: Session = Depends(get_db
     }
 
 @app.delete("/api/devices/reset")
-def reset_devices(db: Session = Depends(get_db)):
+async def reset_devices(db: AsyncSession = Depends(get_db)):
     """
     全デバイス情報をリセット（削除）
     """
     try:
         # 全デバイスを削除
-        deleted_count = db.query(models.Device).count()
-        db.query(models.Device).delete()
-        db.commit()
+        deleted_count = await db.scalar(select(func.count()).select_from(models.Device))
+        await db.execute(delete(models.Device))
+        await db.commit()
+        response_cache.invalidate()
         
         return {
             "message": "All devices have been reset",
             "deleted_count": deleted_count
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to reset devices: {str(e)}")
 
 @app.post("/api/scan/ports")
-def scan_ports(scan_request: schemas.ScanRequest, db: Session = Depends(get_db)):
+async def scan_ports(scan_request: schemas.ScanRequest):
     """
     ポートスキャンを実行
     """
@@ -142,39 +292,30 @@ def scan_ports(scan_request: schemas.ScanRequest, db: Session = Depends(get_db))
         raise HTTPException(status_code=400, detail="IP address is required")
     
     # デバイスの存在確認
-    device = db.query(models.Device).filter(
-        models.Device.ip_address == scan_request.ip_address
-    ).first()
+    # スキャン中（最大 scan_timeout 秒）にDB接続を占有しないよう、確認と保存は別のセッションで行う
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.Device.id).where(models.Device.ip_address == scan_request.ip_address)
+        )
+        device_id = result.scalars().first()
     
-    if not device:
+    if device_id is None:
         raise HTTPException(status_code=404, detail="Device not found")
     
     # ポートスキャン実行
-    scan_results = port_scanner.scan_ports(scan_request.ip_address)
-    
-    # ポートスキャン結果を保存
-    for port_info in scan_results['port_scans']:
-        port_scan = models.PortScan(
-            device_ip=scan_request.ip_address,
-            **port_info
-        )
-        db.add(port_scan)
+    try:
+        await scanners.warm_up_port_scanner()
+    except nmap.PortScannerError as e:
+        raise HTTPException(status_code=503, detail=f"Port scanner is unavailable: {str(e)}")
+    scan_results = await scanners.scan_ports(scan_request.ip_address)
     
-    # HTTPレスポンス情報を保存
-    for http_info in scan_results['http_responses']:
-        # ヘッダーをJSON文字列に変換
-        headers_json = json.dumps(http_info['headers']) if http_info['headers'] else None
-        
-        http_response = models.HttpResponse(
-            device_ip=scan_request.ip_address,
-            url=http_info['url'],
-            status_code=http_info['status_code'],
-            headers=headers_json,
-            body_preview=http_info['body_preview']
+    # スキャン結果を保存
+    async with AsyncSessionLocal() as db:
+        _add_port_scan_results(
+            db, scan_request.ip_address, scan_results['port_scans'], scan_results['http_responses']
         )
-        db.add(http_response)
-    
-    db.commit()
+        await db.commit()
+    response_cache.invalidate()
     
     return {
         "message": "Port scan completed",
@@ -183,17 +324,18 @@ def scan_ports(scan_request: schemas.ScanRequest, db: Session = Depends(get_db))
     }
 
 @app.put("/api/devices/{ip_address}")
-def update_device(
-    ip_address: str, 
-    device_update: schemas.DeviceUpdate, 
-    db: Session = Depends(get_db)
+async def update_device(
+    ip_address: str,
+    device_update: schemas.DeviceUpdate,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     デバイス情報の更新
     """
-    device = db.query(models.Device).filter(
-        models.Device.ip_address == ip_address
-    ).first()
+    result = await db.execute(
+        select(models.Device).where(models.Device.ip_address == ip_address)
+    )
+    device = result.scalars().first()
     
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
@@ -202,15 +344,311 @@ def update_device(
         setattr(device, key, value)
     
     device.last_seen = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    response_cache.invalidate()
     
     return {"message": "Device updated successfully"}
 
+JOB_TYPES = ("network", "ports")
+
+def _is_network_target(target: str) -> bool:
+    """
+    ネットワークスキャンの対象（CIDR・範囲記法・単一IP）として解釈できるか
+    """
+    try:
+        if '-' in target:
+            # 範囲記法 (例: 192.168.1.1-20)
+            start_ip, end_range = target.split('-')
+            ipaddress.IPv4Address(start_ip)
+            return int(start_ip.split('.')[-1]) <= int(end_range) <= 255
+        ipaddress.IPv4Network(target, strict=False)
+        return True
+    except ValueError:
+        return False
+
+@app.post("/api/jobs", response_model=schemas.ScanJob)
+async def create_scan_job(job_create: schemas.ScanJobCreate, db: AsyncSession = Depends(get_db)):
+    """
+    エージェント向けのスキャンジョブを登録
+    """
+    if job_create.job_type not in JOB_TYPES:
+        raise HTTPException(status_code=400, detail="job_type must be 'network' or 'ports'")
+    
+    if job_create.job_type == "network":
+        if not _is_network_target(job_create.target):
+            raise HTTPException(status_code=400, detail="target must be an IPv4 network, range or address")
+    else:
+        try:
+            ipaddress.IPv4Address(job_create.target)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="target must be an IPv4 address")
+        # ローカルのポートスキャンと同様、登録済みのデバイスのみ対象とする
+        result = await db.execute(
+            select(models.Device.id).where(models.Device.ip_address == job_create.target)
+        )
+        if result.scalars().first() is None:
+            raise HTTPException(status_code=404, detail="Device not found")
+    
+    job = models.ScanJob(job_type=job_create.job_type, target=job_create.target, status="pending")
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    
+    return job
+
+@app.get("/api/jobs", response_model=List[schemas.ScanJob])
+async def get_scan_jobs(status: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """
+    スキャンジョブの一覧を取得
+    """
+    stmt = select(models.ScanJob).order_by(models.ScanJob.id.desc())
+    if status:
+        stmt = stmt.where(models.ScanJob.status == status)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+@app.get("/api/agents", response_model=List[schemas.ScanAgent])
+async def get_agents(db: AsyncSession = Depends(get_db)):
+    """
+    エージェントの一覧を取得（リース期間内にハートビートがあれば稼働中）
+    """
+    result = await db.execute(select(models.ScanAgent).order_by(models.ScanAgent.agent_id))
+    alive_since = datetime.utcnow() - timedelta(seconds=AGENT_CONFIG["lease_seconds"])
+    
+    return [
+        schemas.ScanAgent(
+            agent_id=agent.agent_id,
+            hostname=agent.hostname,
+            max_concurrency=agent.max_concurrency,
+            first_seen=agent.first_seen,
+            last_heartbeat=agent.last_heartbeat,
+            is_alive=agent.last_heartbeat >= alive_since
+        )
+        for agent in result.scalars().all()
+    ]
+
+async def _record_heartbeat(db: AsyncSession, agent_id: str, heartbeat: schemas.AgentHeartbeat):
+    """
+    エージェントの生存を記録し、実行中ジョブのリースを延長
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(models.ScanAgent).where(models.ScanAgent.agent_id == agent_id)
+    )
+    agent = result.scalars().first()
+    if not agent:
+        agent = models.ScanAgent(agent_id=agent_id, first_seen=now)
+        db.add(agent)
+    agent.hostname = heartbeat.hostname
+    agent.max_concurrency = heartbeat.max_concurrency
+    agent.last_heartbeat = now
+    
+    if heartbeat.running_job_ids:
+        await db.execute(
+            update(models.ScanJob)
+            .where(
+                models.ScanJob.id.in_(heartbeat.running_job_ids),
+                models.ScanJob.agent_id == agent_id,
+                models.ScanJob.status == "leased"
+            )
+            .values(lease_expires_at=now + timedelta(seconds=AGENT_CONFIG["lease_seconds"]))
+        )
+
+async def _reclaim_expired_leases(db: AsyncSession):
+    """
+    リース期限が切れたジョブ（エージェント停止など）を再割り当て待ちに戻す
+    """
+    now = datetime.utcnow()
+    expired = (
+        models.ScanJob.status == "leased",
+        models.ScanJob.lease_expires_at < now
+    )
+    # 再試行上限に達したジョブは失敗扱い
+    await db.execute(
+        update(models.ScanJob)
+        .where(*expired, models.ScanJob.attempts >= AGENT_CONFIG["max_attempts"])
+        .values(status="failed", error="Lease expired", completed_at=now)
+    )
+    await db.execute(
+        update(models.ScanJob)
+        .where(*expired)
+        .values(status="pending", agent_id=None, lease_expires_at=None)
+    )
+
+@app.post("/api/agents/{agent_id}/heartbeat")
+async def agent_heartbeat(
+    agent_id: str,
+    heartbeat: schemas.AgentHeartbeat,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    エージェントのハートビート
+    """
+    await _record_heartbeat(db, agent_id, heartbeat)
+    await db.commit()
+    
+    return {"message": "Heartbeat received", "lease_seconds": AGENT_CONFIG["lease_seconds"]}
+
+@app.post("/api/agents/{agent_id}/lease", response_model=schemas.LeaseResponse)
+async def lease_scan_jobs(
+    agent_id: str,
+    lease_request: schemas.LeaseRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    待機中のジョブをエージェントにリース
+    """
+    await _record_heartbeat(db, agent_id, lease_request)
+    await _reclaim_expired_leases(db)
+    
+    result = await db.execute(
+        select(models.ScanJob.id)
+        .where(models.ScanJob.status == "pending")
+        .order_by(models.ScanJob.id)
+        .limit(max(lease_request.max_jobs, 0))
+    )
+    
+    leased_ids = []
+    lease_expires_at = datetime.utcnow() + timedelta(seconds=AGENT_CONFIG["lease_seconds"])
+    for job_id in result.scalars().all():
+        # 他のエージェントと競合しないよう、待機中のままの場合のみ更新
+        updated = await db.execute(
+            update(models.ScanJob)
+            .where(models.ScanJob.id == job_id, models.ScanJob.status == "pending")
+            .values(
+                status="leased",
+                agent_id=agent_id,
+                lease_expires_at=lease_expires_at,
+                attempts=models.ScanJob.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if updated.rowcount == 1:
+            leased_ids.append(job_id)
+    await db.commit()
+    
+    jobs = []
+    if leased_ids:
+        result = await db.execute(
+            select(models.ScanJob).where(models.ScanJob.id.in_(leased_ids)).order_by(models.ScanJob.id)
+        )
+        jobs = result.scalars().all()
+    
+    return schemas.LeaseResponse(jobs=jobs, lease_seconds=AGENT_CONFIG["lease_seconds"])
+
+@app.post("/api/agents/{agent_id}/results")
+async def submit_scan_results(agent_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    エージェントからスキャン結果をまとめて受け取る（Content-Encoding: gzip 対応）
+    """
+    body = await request.body()
+    try:
+        if request.headers.get("content-encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        batch = schemas.ScanResultBatch.model_validate_json(body)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid result batch: {str(e)}")
+    
+    accepted = []
+    rejected = []
+    now = datetime.utcnow()
+    for job_result in batch.results:
+        result = await db.execute(
+            select(models.ScanJob).where(models.ScanJob.id == job_result.job_id)
+        )
+        job = result.scalars().first()
+        # 再割り当て済みなど、このエージェントがリースしていないジョブの結果は破棄
+        if not job or job.agent_id != agent_id or job.status != "leased":
+            rejected.append(job_result.job_id)
+            continue
+        
+        if job_result.success:
+            if job.job_type == "network":
+                devices = [device.dict() for device in job_result.devices]
+                await _save_network_devices(db, devices)
+            else:
+                _add_port_scan_results(
+                    db,
+                    job.target,
+                    [port_scan.dict() for port_scan in job_result.port_scans],
+                    [http_response.dict() for http_response in job_result.http_responses]
+                )
+            job.status = "completed"
+        else:
+            job.status = "failed"
+            job.error = job_result.error
+        job.completed_at = now
+        job.lease_expires_at = None
+        accepted.append(job_result.job_id)
+    
+    await db.commit()
+    if accepted:
+        response_cache.invalidate()
+    
+    return {
+        "message": "Results received",
+        "accepted": accepted,
+        "rejected": rejected
+    }
+
+def _validate_transfer_params(table: str, format: str):
+    """
+    エクスポート/インポート対象と形式の検証
+    """
+    if table not in data_transfer.EXPORT_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    if format not in data_transfer.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+@app.get("/api/export/{table}")
+async def export_table(table: str, format: str = "ndjson", device_ip: Optional[str] = None):
+    """
+    デバイス・ポートスキャン履歴・HTTPレスポンスをNDJSON/CSVでストリーミング出力
+    """
+    _validate_transfer_params(table, format)
+    
+    return StreamingResponse(
+        data_transfer.stream_export(table, format, device_ip),
+        media_type=data_transfer.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'}
+    )
+
+@app.post("/api/import/{table}")
+async def import_table(
+    table: str,
+    format: str = "ndjson",
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    エクスポートしたNDJSON/CSVをバッチINSERTで一括取り込み
+    """
+    _validate_transfer_params(table, format)
+    
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        imported_count = await data_transfer.import_records(db, table, stream, format)
+        response_cache.invalidate()
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to import {table}: {str(e)}")
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to import {table}: {str(e)}")
+    finally:
+        stream.detach()
+    
+    return {
+        "message": "Import completed",
+        "table": table,
+        "imported_count": imported_count
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        app, 
-        host=API_CONFIG["host"], 
-        port=API_CONFIG["port"], 
+        app,
+        host=API_CONFIG["host"],
+        port=API_CONFIG["port"],
         reload=API_CONFIG["reload"]
-    )
\ No newline at end of file
+    )
@@ -40,4 +40,28 @@ class HttpResponse(Base):
     status_code = Column(Integer)
     headers = Column(Text)  # JSON文字列として保存
     body_preview = Column(Text)  # ボディの一部を保存
-    scan_time = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    scan_time = Column(DateTime, default=datetime.utcnow)
+
+class ScanJob(Base):
+    __tablename__ = "scan_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(20))  # network, ports
+    target = Column(String(255))  # ネットワーク範囲またはIPアドレス
+    status = Column(String(20), default="pending", index=True)  # pending, leased, completed, failed
+    agent_id = Column(String(255), index=True)  # リース中のエージェント
+    lease_expires_at = Column(DateTime)
+    attempts = Column(Integer, default=0)  # リースされた回数
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime)
+    
+class ScanAgent(Base):
+    __tablename__ = "scan_agents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    agent_id = Column(String(255), unique=True, index=True)
+    hostname = Column(String(255))
+    max_concurrency = Column(Integer, default=1)
+    first_seen = Column(DateTime, default=datetime.utcnow)
+    last_heartbeat = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,327 @@
+"""
+パッシブ検出モジュール
+
+rtnetlinkの近隣（ARP）通知 RTM_NEWNEIGH / RTM_DELNEIGH を購読し、カーネルが
+近隣ホストを学習した時点でデバイス（IPアドレス・MACアドレス・最終確認日時）を登録する。
+プローブを送信しないため、アクティブスキャンは定期的な取りこぼし確認の役割になる。
+Linux専用。Dockerではホストのネットワークを参照できる場合（network_mode: host）のみ有効。
+"""
+import asyncio
+import ipaddress
+import socket
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import sys
+sys.path.append('..')
+from backend import models
+from backend.database import AsyncSessionLocal
+from backend.response_cache import response_cache
+from config.config import PASSIVE_DISCOVERY_CONFIG
+
+# netlink / rtnetlink の定数（linux/netlink.h, linux/rtnetlink.h, linux/neighbour.h）
+NETLINK_ROUTE = 0
+RTMGRP_NEIGH = 0x4
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+RTM_NEWNEIGH = 28
+RTM_DELNEIGH = 29
+RTM_GETNEIGH = 30
+NDA_DST = 1
+NDA_LLADDR = 2
+# 起動時のダンプ要求に付けるシーケンス番号（通知は0）
+DUMP_SEQ = 1
+
+# 近隣エントリの状態（NUD_*）
+NUD_INCOMPLETE = 0x01
+NUD_REACHABLE = 0x02
+NUD_STALE = 0x04
+NUD_DELAY = 0x08
+NUD_PROBE = 0x10
+NUD_FAILED = 0x20
+NUD_NOARP = 0x40
+NUD_PERMANENT = 0x80
+
+# ホストの存在を示す状態
+NUD_VALID = NUD_REACHABLE | NUD_STALE | NUD_DELAY | NUD_PROBE | NUD_PERMANENT
+# 直近に通信が確認された状態（STALEはREACHABLEが時間経過で遷移したものを含む）
+NUD_CONFIRMED = NUD_REACHABLE | NUD_DELAY | NUD_PROBE
+
+NLMSGHDR = struct.Struct("=IHHII")  # len, type, flags, seq, pid
+NDMSG = struct.Struct("=BxxxiHBB")  # family, ifindex, state, flags, type
+RTATTR = struct.Struct("=HH")  # len, type
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def parse_neighbor_messages(data: bytes) -> Iterator[Tuple[int, bool, int, str, Optional[str]]]:
+    """
+    netlinkメッセージから IPv4 の近隣情報
+    （メッセージ種別, ダンプ応答か, 状態, IPアドレス, MACアドレス）を取り出す
+    """
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        msg_len, msg_type, _, seq, _ = NLMSGHDR.unpack_from(data, offset)
+        if msg_len < NLMSGHDR.size:
+            break
+        if msg_type in (RTM_NEWNEIGH, RTM_DELNEIGH):
+            body = offset + NLMSGHDR.size
+            family, _, state, _, _ = NDMSG.unpack_from(data, body)
+            if family == socket.AF_INET:
+                ip_address = None
+                mac_address = None
+                attr = body + NDMSG.size
+                end = offset + msg_len
+                while attr + RTATTR.size <= end:
+                    attr_len, attr_type = RTATTR.unpack_from(data, attr)
+                    if attr_len < RTATTR.size:
+                        break
+                    value = data[attr + RTATTR.size:attr + attr_len]
+                    if attr_type == NDA_DST and len(value) == 4:
+                        ip_address = str(ipaddress.IPv4Address(value))
+                    elif attr_type == NDA_LLADDR and len(value) == 6:
+                        mac_address = ':'.join(f"{b:02x}" for b in value)
+                    attr += _align(attr_len)
+                if ip_address:
+                    yield msg_type, seq == DUMP_SEQ, state, ip_address, mac_address
+        offset += _align(msg_len)
+
+
+class NeighborListener:
+    def __init__(self, flush_interval: float = PASSIVE_DISCOVERY_CONFIG["flush_interval"]):
+        self.flush_interval = flush_interval
+        self._sock: Optional[socket.socket] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # 近隣エントリの直前の状態（STALEへの経年遷移を新規の通信と区別する）
+        self._states: Dict[str, int] = {}
+        # DBに未反映の変更（IPアドレス -> 変更内容）
+        self._pending_online: Dict[str, Dict] = {}
+        self._pending_offline: Dict[str, datetime] = {}
+        # 起動時のダンプで見つかったSTALEエントリ（未登録の場合のみ追加する）
+        self._pending_discovered: Dict[str, Dict] = {}
+        # DBに登録済みのデバイス（IPアドレス -> (MACアドレス, 状態, 最終確認日時)）
+        # 変化のない通知で書き込みとキャッシュ無効化を繰り返さないために使う
+        self._known: Dict[str, Tuple[Optional[str], Optional[str], Optional[datetime]]] = {}
+        self._known_version: Optional[int] = None
+
+    def start(self):
+        """
+        近隣通知の購読を開始（実行中のイベントループに登録）
+        """
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        sock.bind((0, RTMGRP_NEIGH))
+        sock.setblocking(False)
+        self._sock = sock
+
+        # 既に学習済みの近隣テーブルも取り込む
+        request = NLMSGHDR.pack(NLMSGHDR.size + NDMSG.size, RTM_GETNEIGH, NLM_F_REQUEST | NLM_F_DUMP, DUMP_SEQ, 0)
+        request += NDMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+        sock.send(request)
+
+        loop = asyncio.get_running_loop()
+        loop.add_reader(sock.fileno(), self._on_readable)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        print("パッシブ検出を開始しました（rtnetlink 近隣通知）")
+
+    def stop(self):
+        """
+        購読を停止
+        """
+        if self._sock is not None:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    def _on_readable(self):
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # 受信バッファあふれ（ENOBUFS）で通知を取りこぼしても購読は継続する
+                print(f"近隣通知の受信エラー: {e}")
+                return
+            for msg_type, from_dump, state, ip_address, mac_address in parse_neighbor_messages(data):
+                self._handle(msg_type, from_dump, state, ip_address, mac_address)
+
+    def _handle(
+        self,
+        msg_type: int,
+        from_dump: bool,
+        state: int,
+        ip_address: str,
+        mac_address: Optional[str]
+    ):
+        now = datetime.utcnow()
+        previous = self._states.get(ip_address)
+
+        if msg_type == RTM_DELNEIGH:
+            # ガベージコレクションによる削除も含むため、デバイスの状態は変更しない
+            self._states.pop(ip_address, None)
+            return
+
+        self._states[ip_address] = state
+        if state & NUD_FAILED:
+            # アドレス解決に失敗したホストはオフライン
+            self._pending_online.pop(ip_address, None)
+            self._pending_discovered.pop(ip_address, None)
+            self._pending_offline[ip_address] = now
+            return
+        if not state & NUD_VALID or not mac_address:
+            return
+        if state & NUD_STALE and previous is not None and previous & NUD_CONFIRMED:
+            # REACHABLE からの経年遷移は新たな通信ではない
+            return
+        if state & NUD_STALE and from_dump:
+            # ダンプ時点のSTALEは数時間前の通信の可能性があるため、未登録の機器の追加にとどめる
+            self._pending_discovered[ip_address] = {
+                'ip_address': ip_address,
+                'mac_address': mac_address,
+                'status': 'unknown',
+                'first_detected': now,
+                'last_seen': now,
+            }
+            return
+
+        self._pending_offline.pop(ip_address, None)
+        self._pending_discovered.pop(ip_address, None)
+        self._pending_online[ip_address] = {
+            'ip_address': ip_address,
+            'mac_address': mac_address,
+            'status': 'online',
+            'first_detected': now,
+            'last_seen': now,
+        }
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"パッシブ検出の保存エラー: {e}")
+
+    async def flush(self):
+        """
+        貯まった変更をまとめてDBに反映
+        """
+        if not self._pending_online and not self._pending_offline and not self._pending_discovered:
+            return
+        # 他の処理（スキャン・更新・リセット）が書き込んでいれば登録済みデバイスを読み直す
+        if self._known_version != response_cache.version:
+            await self._load_known()
+
+        online = [device for device in self._pending_online.values() if self._needs_update(device)]
+        offline = {
+            ip_address: seen_at
+            for ip_address, seen_at in self._pending_offline.items()
+            if ip_address in self._known and self._known[ip_address][1] != 'offline'
+        }
+        discovered = [
+            device for device in self._pending_discovered.values()
+            if device['ip_address'] not in self._known
+        ]
+        self._pending_online.clear()
+        self._pending_offline.clear()
+        self._pending_discovered.clear()
+        if not online and not offline and not discovered:
+            return
+
+        # 書き込み中に他の処理がDBを変更したかを判定するため、書き込み前のバージョンを記録
+        version_before_write = response_cache.version
+        try:
+            await self._write(online, offline, discovered)
+        except Exception:
+            # 反映に失敗した変更は次回に再試行（その間の新しい変更を優先）
+            for device in online:
+                self._pending_online.setdefault(device['ip_address'], device)
+            for ip_address, seen_at in offline.items():
+                self._pending_offline.setdefault(ip_address, seen_at)
+            for device in discovered:
+                self._pending_discovered.setdefault(device['ip_address'], device)
+            raise
+
+        for device in online + discovered:
+            self._known[device['ip_address']] = (device['mac_address'], device['status'], device['last_seen'])
+        for ip_address in offline:
+            mac_address, _, last_seen = self._known[ip_address]
+            self._known[ip_address] = (mac_address, 'offline', last_seen)
+        response_cache.invalidate()
+        if response_cache.version == version_before_write + 1:
+            # 自身の無効化のみであれば、反映済みの内容で登録済みデバイスは最新
+            self._known_version = response_cache.version
+        # 他の処理（リセットなど）が書き込んでいれば、次回の反映時に読み直す
+        print(f"パッシブ検出: オンライン {len(online)}件, オフライン {len(offline)}件, 新規候補 {len(discovered)}件を反映")
+
+    def _needs_update(self, device: Dict) -> bool:
+        """
+        新規・MACアドレスの変更・状態の変更、または最終確認日時が古い場合のみ書き込む
+        """
+        known = self._known.get(device['ip_address'])
+        if known is None:
+            return True
+        mac_address, status, last_seen = known
+        if mac_address != device['mac_address'] or status != 'online' or last_seen is None:
+            return True
+        interval = timedelta(seconds=PASSIVE_DISCOVERY_CONFIG["last_seen_update_interval"])
+        return device['last_seen'] - last_seen >= interval
+
+    async def _load_known(self):
+        """
+        登録済みデバイスのMACアドレス・状態・最終確認日時を読み込む
+        """
+        version = response_cache.version
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    models.Device.ip_address,
+                    models.Device.mac_address,
+                    models.Device.status,
+                    models.Device.last_seen
+                )
+            )
+            self._known = {
+                ip_address: (mac_address, status, last_seen)
+                for ip_address, mac_address, status, last_seen in result.all()
+            }
+        self._known_version = version
+
+    async def _write(self, online: list, offline: Dict[str, datetime], discovered: list):
+        async with AsyncSessionLocal() as db:
+            if discovered:
+                # 既存のデバイスは状態・最終確認日時を変更しない
+                stmt = sqlite_insert(models.Device).on_conflict_do_nothing(
+                    index_elements=[models.Device.ip_address]
+                )
+                await db.execute(stmt, discovered)
+            if online:
+                stmt = sqlite_insert(models.Device)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[models.Device.ip_address],
+                    set_={
+                        'mac_address': stmt.excluded.mac_address,
+                        'status': stmt.excluded.status,
+                        'last_seen': stmt.excluded.last_seen,
+                    },
+                )
+                await db.execute(stmt, online)
+            for ip_address in offline:
+                await db.execute(
+                    update(models.Device)
+                    .where(models.Device.ip_address == ip_address)
+                    .values(status='offline')
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
@@ -2,18 +2,44 @@
 ネットワークスキャナーモジュール
 """
 import nmap
+import threading
 import socket
 import subprocess
 import re
 import concurrent.futures
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 import sys
 sys.path.append('..')
 from config.config import NETWORK_SCAN_CONFIG
+from backend.rate_controller import get_rate_controller
 
 class NetworkScanner:
     def __init__(self):
-        self.nm = nmap.PortScanner()
+        # nmap.PortScanner() は nmap -V を実行するため初回使用時まで生成しない
+        # スキャン結果はインスタンスに保持されるため、同時実行に備えてスレッドごとに持つ
+        self._local = threading.local()
+        # 同時に実行される他のスイープとも共有する輻輳制御（ウィンドウはプロセス全体で1つ）
+        self.rate_controller = get_rate_controller("network_sweep")
+        # 直近のスイープで応答したIPアドレス（これらの無応答は損失とみなす）
+        self._known_online = set()
+    
+    @property
+    def nm(self) -> nmap.PortScanner:
+        """
+        nmapスキャナーを取得（スレッドごとに初回アクセス時に初期化）
+        """
+        nm = getattr(self._local, 'nm', None)
+        if nm is None:
+            nm = nmap.PortScanner()
+            self._local.nm = nm
+        return nm
+    
+    def warm_up(self):
+        """
+        nmapを事前に初期化（nmapが見つからない場合は例外を送出）
+        """
+        return self.nm
         
     def scan_network(self, network_range: str = None) -> List[Dict]:
         """
@@ -36,9 +62,7 @@ class NetworkScanner:
                 devices = self._scan_with_ping_validation(network_range)
             else:
                 # 通常環境での nmap スキャン
-                self.nm.scan(hosts=network_range, arguments='-sn -R')
-                active_hosts = self.nm.all_hosts()
-                print(f"応答したホスト数: {len(active_hosts)}")
+                active_hosts = self._nmap_sweep(network_range)
                 
                 for host in active_hosts:
                     host_state = self.nm[host].state()
@@ -88,6 +112,41 @@ class NetworkScanner:
         print(f"スキャン完了: {len(devices)}台のデバイスを発見")
         return devices
     
+    def _nmap_sweep(self, network_range: str) -> List[str]:
+        """
+        輻輳制御のウィンドウを並列度としてnmapのpingスイープを実行し、応答したホストを返す
+        
+        直近のスイープで応答したホストの無応答（--host-timeout による打ち切りを含む）を
+        損失、応答したホストを正常応答として記録する。
+        """
+        controller = self.rate_controller
+        # --max-parallelism: 同時に送信するプローブ数の上限（輻輳制御のウィンドウ）
+        # --host-timeout: 応答が極端に遅いホストは打ち切り、結果から除外される
+        scan_args = f"-sn -R --max-parallelism {controller.window} --host-timeout {NETWORK_SCAN_CONFIG['scan_timeout']}s"
+        print(f"nmapコマンド実行: nmap {scan_args} {network_range}")
+        self.nm.scan(hosts=network_range, arguments=scan_args)
+        
+        active_hosts = self.nm.all_hosts()
+        up_hosts = {host for host in active_hosts if self.nm[host].state() == 'up'}
+        print(f"応答したホスト数: {len(active_hosts)}")
+        
+        for _ in up_hosts:
+            controller.record(lost=False)
+        try:
+            targets = set(self._expand_targets(network_range))
+        except ValueError:
+            # ホスト名など展開できない指定では損失を判定しない
+            targets = set()
+        missing = (self._known_online & targets) - up_hosts
+        for _ in missing:
+            controller.record(lost=True)
+        if missing:
+            print(f"直近に応答したホストのうち{len(missing)}件が無応答 (ウィンドウ: {controller.window})")
+        
+        self._known_online.difference_update(targets)
+        self._known_online.update(up_hosts)
+        return active_hosts
+    
     def _get_hostname(self, ip: str) -> Optional[str]:
         """
         IPアドレスからホスト名を取得
@@ -117,7 +176,7 @@ class NetworkScanner:
         
         # Method 3: nmapから取得（利用可能な場合）
         try:
-            if hasattr(self, 'nm') and ip in self.nm.all_hosts():
+            if getattr(self._local, 'nm', None) is not None and ip in self.nm.all_hosts():
                 if 'hostnames' in self.nm[ip]:
                     hostnames = self.nm[ip]['hostnames']
                     if hostnames and len(hostnames) > 0:
@@ -139,70 +198,130 @@ class NetworkScanner:
         except:
             return False
     
+    def _expand_targets(self, network_range: str) -> List[str]:
+        """
+        スキャン範囲（CIDR・範囲記法・単一IP）を個別のIPアドレスに展開
+        """
+        import ipaddress
+        
+        # CIDR記法を解析
+        if '/' in network_range:
+            network = ipaddress.IPv4Network(network_range, strict=False)
+            ip_list = list(network.hosts())
+        elif '-' in network_range:
+            # 範囲記法 (例: 192.168.1.1-20)
+            start_ip, end_range = network_range.split('-')
+            start_parts = start_ip.split('.')
+            start_num = int(start_parts[-1])
+            end_num = int(end_range)
+            base_ip = '.'.join(start_parts[:-1])
+            ip_list = [ipaddress.IPv4Address(f"{base_ip}.{i}") for i in range(start_num, end_num + 1)]
+        else:
+            # 単一IP
+            ip_list = [ipaddress.IPv4Address(network_range)]
+        return [str(ip) for ip in ip_list]
+    
     def _scan_with_ping_validation(self, network_range: str) -> List[Dict]:
         """
         Docker環境での実際のpingベースのスキャン
         """
         devices = []
-        import ipaddress
         
         try:
-            # CIDR記法を解析
-            if '/' in network_range:
-                network = ipaddress.IPv4Network(network_range, strict=False)
-                ip_list = list(network.hosts())
-            elif '-' in network_range:
-                # 範囲記法 (例: 192.168.1.1-20)
-                start_ip, end_range = network_range.split('-')
-                start_parts = start_ip.split('.')
-                start_num = int(start_parts[-1])
-                end_num = int(end_range)
-                base_ip = '.'.join(start_parts[:-1])
-                ip_list = [ipaddress.IPv4Address(f"{base_ip}.{i}") for i in range(start_num, end_num + 1)]
-            else:
-                # 単一IP
-                ip_list = [ipaddress.IPv4Address(network_range)]
+            ip_list = self._expand_targets(network_range)
             
             print(f"検証対象IP数: {len(ip_list)}")
             
-            # 並列でpingチェックを実行（最大20並列）
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                future_to_ip = {executor.submit(self._ping_check, str(ip)): str(ip) for ip in ip_list}
+            # 輻輳制御のウィンドウ内で並列にpingチェックを実行
+            pending_ips = list(ip_list)
+            for _ in range(NETWORK_SCAN_CONFIG["sweep_retries"] + 1):
+                decreases_before = self.rate_controller.decreases
+                online_ips, silent_ips = self._ping_sweep(pending_ips)
                 
-                for future in concurrent.futures.as_completed(future_to_ip):
-                    ip_str = future_to_ip[future]
-                    try:
-                        is_online = future.result()
-                        if is_online:
-                            print(f"応答あり: {ip_str}")
-                            device_info = {
-                                'ip_address': ip_str,
-                                'status': 'online',
-                                'hostname': self._get_hostname(ip_str),
-                                'mac_address': self._get_mac_address(ip_str),
-                                'vendor': None  # Docker環境では制限される
-                            }
-                            devices.append(device_info)
-                        else:
-                            print(f"応答なし: {ip_str}")
-                    except Exception as e:
-                        print(f"エラー {ip_str}: {e}")
+                for ip_str in online_ips:
+                    print(f"応答あり: {ip_str}")
+                    device_info = {
+                        'ip_address': ip_str,
+                        'status': 'online',
+                        'hostname': self._get_hostname(ip_str),
+                        'mac_address': self._get_mac_address(ip_str),
+                        'vendor': None  # Docker環境では制限される
+                    }
+                    devices.append(device_info)
+                
+                # 損失を検出しなかった場合、応答なしはホスト不在と判断
+                if not silent_ips or self.rate_controller.decreases == decreases_before:
+                    break
+                print(f"損失を検出したため応答なしの{len(silent_ips)}件を再確認 (ウィンドウ: {self.rate_controller.window})")
+                pending_ips = silent_ips
+            
+            for ip_str in silent_ips:
+                print(f"応答なし: {ip_str}")
+            
+            # 再確認でも応答がなかったホストは停止したとみなし、以降の無応答は損失に数えない
+            self._known_online.difference_update(silent_ips)
+            self._known_online.update(device['ip_address'] for device in devices)
                     
         except Exception as e:
             print(f"スキャン処理エラー: {e}")
             
         return devices
     
-    def _ping_check(self, ip_str: str) -> bool:
+    def _ping_sweep(self, ip_list: List[str]) -> Tuple[List[str], List[str]]:
         """
-        個別IPアドレスのpingチェック
+        輻輳制御のウィンドウ内でpingを並列実行し、応答あり/なしのIPアドレスを返す
         """
+        controller = self.rate_controller
+        online_ips = []
+        silent_ips = []
+        
+        def probe(ip_str: str) -> bool:
+            try:
+                is_online, lost = self._ping_probe(ip_str)
+            except Exception as e:
+                print(f"エラー {ip_str}: {e}")
+                is_online, lost = False, True
+            controller.release(lost)
+            return is_online
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=int(controller.max_window)) as executor:
+            future_to_ip = {}
+            for ip_str in ip_list:
+                # ウィンドウが埋まっている間は送信を待機
+                controller.acquire()
+                future_to_ip[executor.submit(probe, ip_str)] = ip_str
+            
+            for future in concurrent.futures.as_completed(future_to_ip):
+                if future.result():
+                    online_ips.append(future_to_ip[future])
+                else:
+                    silent_ips.append(future_to_ip[future])
+                    
+        return online_ips, silent_ips
+    
+    def _ping_probe(self, ip_str: str) -> Tuple[bool, Optional[bool]]:
+        """
+        個別IPアドレスのpingチェック（応答の有無, 損失とみなすか）を返す
+        
+        タイムアウト超過・送信エラー・極端に遅い応答、直近のスイープで応答したホストの
+        無応答を輻輳の兆候として扱う。それ以外の無応答（終了コード1）はホスト不在と
+        区別できないため判定不能（None）とし、ウィンドウを広げる根拠にもしない。
+        """
+        ping_timeout = NETWORK_SCAN_CONFIG["ping_timeout"]
+        start = time.monotonic()
         try:
-            result = subprocess.run(['ping', '-c', '1', '-W', '1', ip_str], 
-                                  capture_output=True, text=True, timeout=2)
-            return result.returncode == 0
-        except:
-            return False
+            result = subprocess.run(['ping', '-c', '1', '-W', str(ping_timeout), ip_str], 
+                                  capture_output=True, text=True, timeout=ping_timeout + 1)
+        except subprocess.TimeoutExpired:
+            return False, True
+        elapsed = time.monotonic() - start
+        
+        if result.returncode == 0:
+            return True, elapsed > ping_timeout * NETWORK_SCAN_CONFIG["slow_reply_ratio"]
+        if result.returncode == 1:
+            return False, (True if ip_str in self._known_online else None)
+        # 終了コード2以上は送信エラー（No buffer space available など）
+        return False, True
             
     def _get_mac_address(self, ip: str) -> Optional[str]:
         """
@@ -2,16 +2,39 @@
 ポートスキャナーモジュール
 """
 import nmap
-import requests
+import threading
+import time
 import json
 from typing import Dict, List, Optional
 import sys
 sys.path.append('..')
 from config.config import PORT_SCAN_CONFIG
+from backend.rate_controller import get_rate_controller
 
 class PortScanner:
     def __init__(self):
-        self.nm = nmap.PortScanner()
+        # nmap.PortScanner() は nmap -V を実行するため初回使用時まで生成しない
+        # スキャン結果はインスタンスに保持されるため、同時実行に備えてスレッドごとに持つ
+        self._local = threading.local()
+        # nmapの並列度はスキャン間で共有する輻輳制御のウィンドウに従う
+        self.rate_controller = get_rate_controller("port_scan")
+    
+    @property
+    def nm(self) -> nmap.PortScanner:
+        """
+        nmapスキャナーを取得（スレッドごとに初回アクセス時に初期化）
+        """
+        nm = getattr(self._local, 'nm', None)
+        if nm is None:
+            nm = nmap.PortScanner()
+            self._local.nm = nm
+        return nm
+    
+    def warm_up(self):
+        """
+        nmapを事前に初期化（nmapが見つからない場合は例外を送出）
+        """
+        return self.nm
         
     def scan_ports(self, ip_address: str) -> Dict:
         """
@@ -28,10 +51,13 @@ class PortScanner:
             # -T3: 通常タイミング（ネットワークに優しい）
             # --max-retries: 再試行回数制限
             # --host-timeout: ホストあたりの最大時間
-            scan_args = f"-Pn -sS -{PORT_SCAN_CONFIG['timing_template']} --max-retries {PORT_SCAN_CONFIG['max_retries']} --host-timeout {PORT_SCAN_CONFIG['scan_timeout']}s"
+            # --max-parallelism: 同時に送信するプローブ数の上限（輻輳制御のウィンドウ）
+            parallelism = self.rate_controller.window
+            scan_args = f"-Pn -sS -{PORT_SCAN_CONFIG['timing_template']} --max-retries {PORT_SCAN_CONFIG['max_retries']} --host-timeout {PORT_SCAN_CONFIG['scan_timeout']}s --max-parallelism {parallelism}"
             
             print(f"nmapコマンド実行: nmap {scan_args} -p {PORT_SCAN_CONFIG['port_range']} {ip_address}")
             
+            scan_started = time.monotonic()
             self.nm.scan(
                 hosts=ip_address, 
                 ports=PORT_SCAN_CONFIG['port_range'], 
@@ -41,6 +67,13 @@ class PortScanner:
             
             print(f"スキャン完了。検出されたホスト: {self.nm.all_hosts()}")
             
+            # --host-timeout で打ち切られた場合のみ損失とみなす
+            # （開いたポートがないホストは extraports に集約され 'tcp' キーを持たないが正常）
+            elapsed = time.monotonic() - scan_started
+            timed_out = (elapsed >= PORT_SCAN_CONFIG['scan_timeout'] - 1
+                         or ip_address not in self.nm.all_hosts())
+            self.rate_controller.record(lost=timed_out)
+            
             if ip_address in self.nm.all_hosts():
                 host_info = self.nm[ip_address]
                 print(f"ホスト状態: {host_info.get('status', {}).get('state', 'unknown')}")
@@ -92,6 +125,8 @@ class PortScanner:
                 
         except Exception as e:
             print(f"ポートスキャンエラー: {e}")
+            if isinstance(e, nmap.PortScannerTimeout):
+                self.rate_controller.record(lost=True)
             import traceback
             traceback.print_exc()
                 
@@ -131,6 +166,9 @@ class PortScanner:
         """
         HTTPレスポンスを取得
         """
+        # requestsのインポートは重いため起動時ではなく初回のHTTP取得時に行う
+        import requests
+        
         url = f"{service}://{ip}:{port}"
         
         try:
@@ -154,6 +192,9 @@ class PortScanner:
                 'body_preview': body_preview
             }
             
+        except requests.Timeout as e:
+            print(f"HTTPリクエストタイムアウト ({url}): {e}")
+            return None
         except Exception as e:
             print(f"HTTPリクエストエラー ({url}): {e}")
             return None
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+プローブ送信レートの輻輳制御モジュール
+
+TCPの輻輳回避と同様のAIMD（加算的増加・乗算的減少）で同時送信数（ウィンドウ）を調整する。
+応答が正常な間はウィンドウを広げ、タイムアウトや送信エラーの割合が閾値を超えたら縮める。
+ネットワークスイープとポートスキャンで共有し、現在のウィンドウはメトリクスとして公開する。
+"""
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+import sys
+sys.path.append('..')
+from config.config import RATE_CONTROL_CONFIG
+
+
+class AIMDRateController:
+    def __init__(
+        self,
+        name: str,
+        initial_window: float,
+        min_window: float,
+        max_window: float,
+        additive_increase: float = 1.0,
+        increase_per_window: bool = True,
+        multiplicative_decrease: float = 0.5,
+        loss_threshold: float = 0.05,
+        sample_size: int = 50,
+        min_samples: int = 10,
+    ):
+        self.name = name
+        self.min_window = min_window
+        self.max_window = max_window
+        self.additive_increase = additive_increase
+        # True: ウィンドウ1つ分の正常応答で additive_increase 広げる（プローブ単位の記録向け）
+        # False: 正常応答1件ごとに additive_increase 広げる（nmapの1スキャン単位の記録向け）
+        self.increase_per_window = increase_per_window
+        self.multiplicative_decrease = multiplicative_decrease
+        self.loss_threshold = loss_threshold
+        self.min_samples = min_samples
+        self._window = float(initial_window)
+        self._in_flight = 0
+        self._samples = deque(maxlen=sample_size)  # 直近のプローブが損失したかどうか
+        self._condition = threading.Condition()
+        self.increases = 0
+        self.decreases = 0
+        self.total_probes = 0
+        self.total_losses = 0
+
+    @property
+    def window(self) -> int:
+        """
+        現在の同時送信数の上限
+        """
+        return max(int(self._window), 1)
+
+    def acquire(self):
+        """
+        送信枠を確保（ウィンドウが埋まっている間は待機）
+        """
+        with self._condition:
+            while self._in_flight >= self.window:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, lost: Optional[bool]):
+        """
+        送信枠を解放し、プローブの結果を記録（lost=None は判定不能として記録しない）
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if lost is not None:
+                self._record(lost)
+            self._condition.notify_all()
+
+    def record(self, lost: bool):
+        """
+        送信枠を使わないプローブ（nmapの1スキャンなど）の結果を記録
+        """
+        with self._condition:
+            self._record(lost)
+            self._condition.notify_all()
+
+    def _record(self, lost: bool):
+        self._samples.append(lost)
+        self.total_probes += 1
+        if lost:
+            self.total_losses += 1
+
+        if not lost:
+            # 加算的増加
+            if self._window < self.max_window:
+                increase = self.additive_increase
+                if self.increase_per_window:
+                    increase /= self._window
+                self._window = min(self.max_window, self._window + increase)
+                self.increases += 1
+            return
+
+        if len(self._samples) >= self.min_samples and self.loss_rate > self.loss_threshold:
+            # 乗算的減少: 同じ損失の塊で何度も縮めないよう、観測をリセットする
+            self._window = max(self.min_window, self._window * self.multiplicative_decrease)
+            self._samples.clear()
+            self.decreases += 1
+
+    @property
+    def loss_rate(self) -> float:
+        """
+        直近のプローブの損失率
+        """
+        if not self._samples:
+            return 0.0
+        return sum(self._samples) / len(self._samples)
+
+    def stats(self) -> Dict:
+        """
+        コントローラーの状態を取得
+        """
+        with self._condition:
+            return {
+                "window": self.window,
+                "in_flight": self._in_flight,
+                "loss_rate": round(self.loss_rate, 4),
+                "min_window": self.min_window,
+                "max_window": self.max_window,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "total_probes": self.total_probes,
+                "total_losses": self.total_losses,
+            }
+
+
+# スキャナー間で共有するコントローラー
+_controllers: Dict[str, AIMDRateController] = {
+    name: AIMDRateController(name, **params)
+    for name, params in RATE_CONTROL_CONFIG.items()
+}
+
+
+def get_rate_controller(name: str) -> AIMDRateController:
+    """
+    名前を指定して共有のコントローラーを取得（network_sweep / port_scan）
+    """
+    return _controllers[name]
+
+
+def get_rate_metrics() -> Dict:
+    """
+    全コントローラーの状態を取得
+    """
+    return {name: controller.stats() for name, controller in _controllers.items()}
@@ -0,0 +1,102 @@
+"""
+レスポンスキャッシュモジュール
+
+デバイス一覧・デバイス詳細のシリアライズ済みレスポンス（bytes）をプロセス内に保持する。
+LRUで追い出し、合計サイズに上限を設ける。スキャンやデバイス更新などの書き込み時は
+バージョンを進めて全エントリを無効化する。
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import sys
+sys.path.append('..')
+from config.config import CACHE_CONFIG
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int, max_entries: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        self._size = 0
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        """
+        現在のバージョン（DB読み込みの前に取得し、set() に渡す）
+        """
+        return self._version
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        キャッシュを取得（古いバージョンのエントリはミス扱い）
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self._version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: bytes, version: int):
+        """
+        キャッシュを登録
+
+        読み込み中に書き込みがあった場合（version が古い）は登録しない。
+        """
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[key] = (version, value)
+            self._size += len(value)
+            # 上限を超えた分を古い順に追い出す
+            while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self):
+        """
+        バージョンを進めて全エントリを無効化
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """
+        キャッシュの統計情報を取得
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "version": self._version,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# アプリケーション全体で共有するキャッシュ
+response_cache = ResponseCache(
+    max_bytes=CACHE_CONFIG["max_bytes"],
+    max_entries=CACHE_CONFIG["max_entries"],
+    enabled=CACHE_CONFIG["enabled"],
+)
@@ -0,0 +1,151 @@
+"""
+スキャナー管理モジュール
+
+NetworkScanner / PortScanner を初回使用時に生成し、起動後はバックグラウンドで
+nmapの初期化（ウォームアップ）を行う。nmapが見つからない場合もAPI全体は起動し、
+スキャン系エンドポイントのみが利用不可となる。
+
+スキャンはブロッキング処理のため、専用スレッドプールで実行するコルーチンとして
+公開する。長時間のスキャンがリクエスト処理用のスレッドを占有しない。
+"""
+import asyncio
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+import sys
+sys.path.append('..')
+from backend.network_scanner import NetworkScanner
+from backend.port_scanner import PortScanner
+from config.config import SCANNER_CONFIG
+
+# スキャナーの状態
+STATUS_NOT_INITIALIZED = "not_initialized"
+STATUS_WARMING = "warming"
+STATUS_READY = "ready"
+STATUS_UNAVAILABLE = "unavailable"
+
+_lock = threading.Lock()
+_network_scanner: Optional[NetworkScanner] = None
+_port_scanner: Optional[PortScanner] = None
+_status: Dict[str, str] = {
+    "network_scanner": STATUS_NOT_INITIALIZED,
+    "port_scanner": STATUS_NOT_INITIALIZED,
+}
+_errors: Dict[str, str] = {}
+
+
+
+def get_network_scanner() -> NetworkScanner:
+    """
+    NetworkScannerを取得（初回呼び出し時に生成）
+    """
+    global _network_scanner
+    if _network_scanner is None:
+        with _lock:
+            if _network_scanner is None:
+                _network_scanner = NetworkScanner()
+    return _network_scanner
+
+
+def get_port_scanner() -> PortScanner:
+    """
+    PortScannerを取得（初回呼び出し時に生成）
+    """
+    global _port_scanner
+    if _port_scanner is None:
+        with _lock:
+            if _port_scanner is None:
+                _port_scanner = PortScanner()
+    return _port_scanner
+
+
+def _init_scan_worker():
+    """
+    スキャン用スレッドの初期化（nmapはスレッドごとに持つため、実際にスキャンするスレッドで生成）
+    """
+    for name, scanner in (("network_scanner", get_network_scanner()), ("port_scanner", get_port_scanner())):
+        try:
+            scanner.warm_up()
+        except Exception as e:
+            # 初期化子から例外を送出するとプール全体が使えなくなるため状態の記録にとどめる
+            print(f"スキャナー初期化エラー ({name}): {e}")
+            _status[name] = STATUS_UNAVAILABLE
+            _errors[name] = str(e)
+
+
+# スキャン専用のスレッドプール
+_scan_executor = ThreadPoolExecutor(
+    max_workers=SCANNER_CONFIG["max_concurrent_scans"],
+    thread_name_prefix="scan",
+    initializer=_init_scan_worker,
+)
+
+
+def warm_up_scanners_in_background() -> threading.Thread:
+    """
+    nmapの存在を確認し、スキャン用スレッドをバックグラウンドで起動・初期化
+    """
+    def run():
+        names = ("network_scanner", "port_scanner")
+        for name in names:
+            _status[name] = STATUS_WARMING
+
+        if shutil.which("nmap") is None:
+            for name in names:
+                _status[name] = STATUS_UNAVAILABLE
+                _errors[name] = "nmap program was not found in path"
+            return
+
+        # 全スレッドが揃うまで待たせることで、プールの全スレッドを起動させる
+        # （各スレッドは起動時に _init_scan_worker でnmapを初期化する）
+        workers = SCANNER_CONFIG["max_concurrent_scans"]
+        barrier = threading.Barrier(workers)
+        futures = [_scan_executor.submit(barrier.wait, 30) for _ in range(workers)]
+        wait(futures)
+
+        for name in names:
+            if _status[name] == STATUS_WARMING:
+                _status[name] = STATUS_READY
+                _errors.pop(name, None)
+
+    thread = threading.Thread(target=run, name="scanner-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_scanner_status() -> Dict:
+    """
+    各スキャナーの初期化状態を取得
+    """
+    return {
+        "scanners": dict(_status),
+        "errors": dict(_errors),
+    }
+
+
+async def _run_in_scan_executor(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_scan_executor, func, *args)
+
+
+async def scan_network(network_range: Optional[str] = None) -> List[Dict]:
+    """
+    ネットワークスキャンを非同期に実行
+    """
+    return await _run_in_scan_executor(get_network_scanner().scan_network, network_range)
+
+
+async def warm_up_port_scanner():
+    """
+    PortScannerのnmapを非同期に初期化（nmapが見つからない場合は例外を送出）
+    """
+    return await _run_in_scan_executor(get_port_scanner().warm_up)
+
+
+async def scan_ports(ip_address: str) -> Dict:
+    """
+    ポートスキャンを非同期に実行
+    """
+    return await _run_in_scan_executor(get_port_scanner().scan_ports, ip_address)
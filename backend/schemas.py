@@ -65,4 +65,67 @@ class DeviceDetail(Device):
 
 class ScanRequest(BaseModel):
     network_range: Optional[str] = None
-    ip_address: Optional[str] = None
\ No newline at end of file
+    ip_address: Optional[str] = None
+
+class ScanJobCreate(BaseModel):
+    job_type: str  # network, ports
+    target: str
+
+class ScanJob(ScanJobCreate):
+    id: int
+    status: str
+    agent_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class ScanAgent(BaseModel):
+    agent_id: str
+    hostname: Optional[str] = None
+    max_concurrency: int = 1
+    first_seen: datetime
+    last_heartbeat: datetime
+    is_alive: bool = False
+    
+    class Config:
+        from_attributes = True
+
+class AgentHeartbeat(BaseModel):
+    hostname: Optional[str] = None
+    max_concurrency: int = 1
+    running_job_ids: List[int] = []
+
+class LeaseRequest(AgentHeartbeat):
+    max_jobs: int = 1
+
+class LeaseResponse(BaseModel):
+    jobs: List[ScanJob] = []
+    lease_seconds: int
+
+class PortScanResult(BaseModel):
+    port: int
+    service: Optional[str] = None
+    service_name: Optional[str] = None
+    is_open: bool = False
+
+class HttpResponseResult(BaseModel):
+    url: str
+    status_code: Optional[int] = None
+    headers: Optional[Dict] = None
+    body_preview: Optional[str] = None
+
+class ScanJobResult(BaseModel):
+    job_id: int
+    success: bool = True
+    error: Optional[str] = None
+    devices: List[DeviceCreate] = []
+    port_scans: List[PortScanResult] = []
+    http_responses: List[HttpResponseResult] = []
+
+class ScanResultBatch(BaseModel):
+    results: List[ScanJobResult] = []
\ No newline at end of file
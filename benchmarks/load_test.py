@@ -0,0 +1,126 @@
+"""
+APIの負荷試験スクリプト
+
+ダッシュボードの読み取り（GET /api/devices）を多数同時に発行し、スループットと
+レイテンシを計測する。--url を複数指定すると結果を並べて比較できる。
+--scan-ip を指定すると、計測中にポートスキャンを並行して実行し、長時間スキャンが
+読み取りリクエストを妨げないかを確認できる。
+
+使い方（同期版と非同期版の比較例）:
+    # 比較対象の旧バージョンを別ポートで起動しておく
+    python benchmarks/load_test.py --url http://localhost:8001 --url http://localhost:8000 \\
+        --concurrency 1000 --requests 20000 --scan-ip 192.168.1.10 --scans 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import aiohttp
+
+
+async def _read_worker(session: aiohttp.ClientSession, url: str, queue: asyncio.Queue,
+                       latencies: List[float], errors: List[str]):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            async with session.get(url) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(f"HTTP {response.status}")
+                    continue
+        except Exception as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def _scan(session: aiohttp.ClientSession, base_url: str, ip_address: str):
+    try:
+        async with session.post(f"{base_url}/api/scan/ports", json={"ip_address": ip_address}) as response:
+            await response.read()
+    except Exception:
+        pass
+
+
+async def run_load_test(base_url: str, path: str, concurrency: int, total_requests: int,
+                        scan_ip: str = None, scans: int = 0) -> Dict:
+    """
+    1つのサーバーに対して負荷試験を実行
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total_requests):
+        queue.put_nowait(None)
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=None)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        # 長時間スキャンを先に投入し、読み取りと並行させる
+        scan_tasks = [
+            asyncio.create_task(_scan(session, base_url, scan_ip))
+            for _ in range(scans if scan_ip else 0)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            _read_worker(session, f"{base_url}{path}", queue, latencies, errors)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+        for task in scan_tasks:
+            task.cancel()
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return float("nan")
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "url": base_url,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "mean": statistics.mean(latencies) * 1000 if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APIの負荷試験")
+    parser.add_argument("--url", action="append", required=True, help="APIのベースURL（複数指定で比較）")
+    parser.add_argument("--path", default="/api/devices", help="計測するエンドポイント")
+    parser.add_argument("--concurrency", type=int, default=200, help="同時接続数")
+    parser.add_argument("--requests", type=int, default=5000, help="総リクエスト数")
+    parser.add_argument("--scan-ip", default=None, help="計測中にポートスキャンするIPアドレス")
+    parser.add_argument("--scans", type=int, default=0, help="並行して実行するポートスキャン数")
+    args = parser.parse_args()
+
+    results = []
+    for base_url in args.url:
+        print(f"計測中: {base_url}{args.path}")
+        results.append(asyncio.run(run_load_test(
+            base_url.rstrip("/"), args.path, args.concurrency, args.requests,
+            args.scan_ip, args.scans
+        )))
+
+    print(f"\n{'URL':<32}{'成功':>8}{'失敗':>8}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for result in results:
+        print(
+            f"{result['url']:<32}{result['requests']:>8}{result['errors']:>8}"
+            f"{result['rps']:>10.1f}{result['p50']:>10.1f}{result['p95']:>10.1f}{result['p99']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+バックエンド起動時間ベンチマーク
+
+新しいPythonプロセスで以下を計測し、STARTUP_CONFIG["startup_budget_seconds"] と比較する。
+- import: backend.main のインポート時間
+- startup: startupイベント（init_db など）の実行時間
+- first_read: 起動直後の GET /api/devices の応答時間
+
+使い方:
+    python benchmarks/startup_benchmark.py [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+from config.config import STARTUP_CONFIG
+
+# 計測用の子プロセスで実行するコード
+MEASURE_SCRIPT = r'''
+import asyncio
+import json
+import time
+
+start = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+
+async def get(path):
+    """ASGIアプリを直接呼び出してGETリクエストを処理"""
+    status = {}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code")
+
+async def main():
+    await app.router.startup()
+    started = time.perf_counter()
+    code = await get("/api/devices")
+    first_read = time.perf_counter()
+    # shutdownイベントでエンジンを破棄（プールの接続が残るとプロセスが終了しない）
+    await app.router.shutdown()
+    print(json.dumps({
+        "import": imported - start,
+        "startup": started - imported,
+        "first_read": first_read - started,
+        "total": first_read - start,
+        "status_code": code,
+    }))
+
+asyncio.run(main())
+'''
+
+
+def measure_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    # スキャナーのログ出力などが混ざるため最終行のJSONのみを読む
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="バックエンド起動時間ベンチマーク")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数")
+    args = parser.parse_args()
+
+    samples = [measure_once() for _ in range(args.runs)]
+    budget = STARTUP_CONFIG["startup_budget_seconds"]
+
+    print(f"計測回数: {args.runs}")
+    for key in ("import", "startup", "first_read", "total"):
+        values = [sample[key] for sample in samples]
+        print(f"{key:>10}: 中央値 {statistics.median(values) * 1000:8.1f} ms / 最大 {max(values) * 1000:8.1f} ms")
+
+    median_total = statistics.median(sample["total"] for sample in samples)
+    if any(sample["status_code"] != 200 for sample in samples):
+        print("GET /api/devices が200を返しませんでした")
+        sys.exit(1)
+    if median_total > budget:
+        print(f"起動時間が目標を超過: {median_total:.3f}s > {budget:.3f}s")
+        sys.exit(1)
+    print(f"起動時間は目標内: {median_total:.3f}s <= {budget:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,21 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 # データベース設定
 DATABASE_URL = f"sqlite:///{BASE_DIR}/database/lan_monitor.db"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{BASE_DIR}/database/lan_monitor.db"
+# コネクションプール設定（aiosqliteは接続ごとにスレッドを持つため接続数を制限する）
+DATABASE_POOL_CONFIG = {
+    "pool_size": 5,  # 常時保持する接続数
+    "max_overflow": 10,  # 一時的に追加で開ける接続数
+    "pool_timeout": 30,  # 接続が空くまで待つ最大時間（秒）
+}
 
 # ネットワークスキャン設定
 NETWORK_SCAN_CONFIG = {
     "default_network": "192.168.1.0/24",  # デフォルトのスキャン範囲
     "scan_timeout": 10,  # スキャンタイムアウト（秒）
     "ping_timeout": 1,  # ping応答タイムアウト（秒）
+    "sweep_retries": 1,  # 損失を検出したスイープで応答のなかったホストを再確認する回数
+    "slow_reply_ratio": 0.8,  # タイムアウトに対してこの割合以上遅い応答は輻輳の兆候とみなす
 }
 
 # ポートスキャン設定
@@ -25,6 +34,81 @@ PORT_SCAN_CONFIG = {
     "max_retries": 1,  # 再試行回数
 }
 
+# パッシブ検出設定（rtnetlink 近隣通知、Linux専用）
+PASSIVE_DISCOVERY_CONFIG = {
+    # ホストのネットワークを参照できる環境（Linux直接実行、Dockerでは network_mode: host）でのみ有効にする
+    # ブリッジネットワークのコンテナではゲートウェイや他のコンテナが機器として登録されてしまう
+    "enabled": False,
+    "flush_interval": 1.0,  # 検出結果をまとめてDBに反映する間隔（秒）
+    "last_seen_update_interval": 300,  # 変化のない機器の最終確認日時を更新する最短間隔（秒）
+    "safety_sweep_interval": 3600,  # 取りこぼし確認のアクティブスキャン間隔（秒、0で無効）
+}
+
+# 輻輳制御設定（AIMD）
+# additive_increase はウィンドウ1つ分の正常応答ごとに広げる量（1プローブあたり additive_increase / window）
+# increase_per_window を False にすると正常応答1件ごとに additive_increase 広げる
+RATE_CONTROL_CONFIG = {
+    # pingスイープの同時送信数
+    "network_sweep": {
+        "initial_window": 20,
+        "min_window": 4,
+        "max_window": 128,
+        "additive_increase": 1,
+        "multiplicative_decrease": 0.5,
+        "loss_threshold": 0.05,  # 直近の損失率がこれを超えたら縮小
+        "sample_size": 50,  # 損失率を計算する直近のプローブ数
+        "min_samples": 10,  # 判定に必要な最小プローブ数
+    },
+    # nmapの --max-parallelism（1回のポートスキャンを1プローブとして扱う）
+    "port_scan": {
+        "initial_window": 100,
+        "min_window": 10,
+        "max_window": 1000,
+        "additive_increase": 10,  # 打ち切られずに完了したスキャン1回ごとに広げる量
+        "increase_per_window": False,
+        "multiplicative_decrease": 0.5,
+        "loss_threshold": 0.2,
+        "sample_size": 20,
+        "min_samples": 1,
+    },
+}
+
+# スキャン実行設定
+SCANNER_CONFIG = {
+    "max_concurrent_scans": 4,  # 同時に実行するスキャン数（専用スレッドプールのサイズ）
+}
+
+# 分散スキャンエージェント設定
+AGENT_CONFIG = {
+    "lease_seconds": 60,  # ジョブのリース期間（ハートビートで延長、期限切れで再割り当て）
+    "heartbeat_interval": 15,  # ハートビート送信間隔（秒）
+    "poll_interval": 5,  # ジョブ取得の間隔（秒）
+    "max_concurrency": 2,  # エージェントあたりの同時実行ジョブ数
+    "max_attempts": 3,  # リース期限切れによる再割り当ての上限回数
+    "result_batch_size": 20,  # 結果をまとめて送信する件数
+    "result_flush_interval": 2,  # 結果送信の最大待ち時間（秒）
+}
+
+# レスポンスキャッシュ設定
+CACHE_CONFIG = {
+    "enabled": True,
+    "max_bytes": 32 * 1024 * 1024,  # キャッシュ全体のメモリ上限（バイト）
+    "max_entries": 1024,  # キャッシュするレスポンス数の上限
+}
+
+# エクスポート/インポート設定
+EXPORT_CONFIG = {
+    "fetch_batch_size": 1000,  # サーバーサイドカーソルで一度にフェッチする行数
+    "chunk_rows": 500,  # ストリーミング時に1チャンクへまとめる行数
+    "import_batch_size": 1000,  # バルクインポート時に一括INSERTする行数
+}
+
+# 起動設定
+STARTUP_CONFIG = {
+    "warmup_scanners": True,  # 起動後にバックグラウンドでnmapを初期化
+    "startup_budget_seconds": 1.5,  # 起動時間の目標（benchmarks/startup_benchmark.py で検証）
+}
+
 # API設定
 API_CONFIG = {
     "host": "0.0.0.0",